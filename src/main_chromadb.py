@@ -3,8 +3,9 @@ from contextlib import asynccontextmanager
 from collections.abc import AsyncIterator
 from dataclasses import dataclass
 from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
 import asyncio
-import json
+import orjson
 import os
 
 from utils_chromadb import get_chromadb_client, ChromaMemoryClient
@@ -33,7 +34,7 @@ async def chromadb_lifespan(server: FastMCP) -> AsyncIterator[ChromaContext]:
     """
     # Create and return the ChromaDB client
     print("Initializing ChromaDB client...")
-    chromadb_client = get_chromadb_client()
+    chromadb_client = await asyncio.to_thread(get_chromadb_client)
     print("ChromaDB client initialized successfully!")
     
     try:
@@ -64,7 +65,7 @@ async def save_memory(ctx: Context, text: str) -> str:
     """
     try:
         chromadb_client = ctx.request_context.lifespan_context.chromadb_client
-        result = chromadb_client.add_memory(text, DEFAULT_USER_ID)
+        result = await asyncio.to_thread(chromadb_client.add_memory, text, DEFAULT_USER_ID)
         return result
     except Exception as e:
         return f"Error saving memory: {str(e)}"
@@ -83,11 +84,11 @@ async def get_all_memories(ctx: Context) -> str:
     """
     try:
         chromadb_client = ctx.request_context.lifespan_context.chromadb_client
-        memories = chromadb_client.get_all_memories(DEFAULT_USER_ID)
+        memories = await asyncio.to_thread(chromadb_client.get_all_memories, DEFAULT_USER_ID)
         
         # Extract just the memory content for cleaner output
         flattened_memories = [memory["memory"] for memory in memories]
-        return json.dumps(flattened_memories, indent=2)
+        return orjson.dumps(flattened_memories, option=orjson.OPT_INDENT_2).decode()
     except Exception as e:
         return f"Error retrieving memories: {str(e)}"
 
@@ -106,11 +107,11 @@ async def search_memories(ctx: Context, query: str, limit: int = 3) -> str:
     """
     try:
         chromadb_client = ctx.request_context.lifespan_context.chromadb_client
-        memories = chromadb_client.search_memories(query, DEFAULT_USER_ID, limit)
+        memories = await asyncio.to_thread(chromadb_client.search_memories, query, DEFAULT_USER_ID, limit)
         
         # Extract just the memory content for cleaner output
         flattened_memories = [memory["memory"] for memory in memories]
-        return json.dumps(flattened_memories, indent=2)
+        return orjson.dumps(flattened_memories, option=orjson.OPT_INDENT_2).decode()
     except Exception as e:
         return f"Error searching memories: {str(e)}"
 
@@ -124,7 +125,7 @@ async def export_memories(ctx: Context, filename: str = None) -> str:
     """
     try:
         chromadb_client = ctx.request_context.lifespan_context.chromadb_client
-        result = chromadb_client.export_memories_to_json(DEFAULT_USER_ID, filename)
+        result = await asyncio.to_thread(chromadb_client.export_memories_to_json, DEFAULT_USER_ID, filename)
         return result
     except Exception as e:
         return f"Error exporting memories: {str(e)}"
@@ -139,7 +140,7 @@ async def import_memories(ctx: Context, filename: str) -> str:
     """
     try:
         chromadb_client = ctx.request_context.lifespan_context.chromadb_client
-        result = chromadb_client.import_memories_from_json(filename, DEFAULT_USER_ID)
+        result = await asyncio.to_thread(chromadb_client.import_memories_from_json, filename, DEFAULT_USER_ID)
         return result
     except Exception as e:
         return f"Error importing memories: {str(e)}"
@@ -153,12 +154,18 @@ async def get_memory_stats(ctx: Context) -> str:
     """
     try:
         chromadb_client = ctx.request_context.lifespan_context.chromadb_client
-        stats = chromadb_client.get_collection_info()
-        return json.dumps(stats, indent=2)
+        stats = await asyncio.to_thread(chromadb_client.get_collection_info)
+        return orjson.dumps(stats, option=orjson.OPT_INDENT_2).decode()
     except Exception as e:
         return f"Error getting memory stats: {str(e)}"
 
 async def main():
+    # Blocking ChromaDB / embedding work runs on this pool via asyncio.to_thread;
+    # installed once per process since the lifespan runs per SSE connection
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=os.cpu_count())
+    )
+    
     transport = os.getenv("TRANSPORT", "sse")
     if transport == 'sse':
         # Run the MCP server with sse transport
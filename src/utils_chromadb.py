@@ -3,52 +3,491 @@ ChromaDB utilities for MCP server
 Provides local vector storage with semantic search
 """
 import chromadb
-from sentence_transformers import SentenceTransformer
+import chromadb.errors
+from collections import OrderedDict
+from functools import cached_property
 from datetime import datetime
-import uuid
-import json
+import numpy as np
+import threading
+import hashlib
+import sqlite3
+import orjson
+import time
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
+
+from utils_vector_scan import InMemoryIndex, top_k_cosine
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+# Local sentence-transformers model used for all embeddings
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+EMBEDDING_DIMENSION = 384
+
+# Sentence-transformers batch size for encoding many texts at once
+ENCODE_BATCH_SIZE = 64
+
+# Number of records sent to ChromaDB per collection.upsert call
+CHROMA_BATCH_SIZE = 250
+
+# Settings for newly created collections: cheaper index construction for the
+# write-heavy import path (construction_ef below the default of 100), a search
+# beam wider than the default of 100 to keep recall once searches go through
+# HNSW, and larger batches between index flushes
+COLLECTION_METADATA = {
+    "description": "MCP server memories",
+    "hnsw:space": "cosine",
+    "hnsw:M": 16,
+    "hnsw:construction_ef": 64,
+    "hnsw:search_ef": 128,
+    "hnsw:batch_size": 500,
+    "hnsw:sync_threshold": 2000
+}
+
+# On-disk precision for cached embeddings; unit-length vectors lose
+# practically nothing in float16 and take half the space
+EMBEDDING_CACHE_DTYPE = np.float16
+
+# Number of single-text embeddings kept in the in-process LRU cache
+QUERY_CACHE_SIZE = 1024
+
+# Number of memories fetched per page when streaming an export
+EXPORT_PAGE_SIZE = 1000
+
+# Below this many memories, search scans an in-memory matrix instead of HNSW
+BRUTE_FORCE_THRESHOLD = 10_000
+
+# Maximum number of hashes per SQL "IN (...)" lookup (SQLite variable limit)
+SQLITE_IN_BATCH_SIZE = 500
+
+# Embedding model shared by every client, loaded on first use
+_MODEL: Optional["SentenceTransformer"] = None
+_MODEL_LOCK = threading.Lock()
+
+def get_embedding_model() -> "SentenceTransformer":
+    """Return the shared embedding model, loading it on first call"""
+    global _MODEL
+    if _MODEL is None:
+        with _MODEL_LOCK:
+            if _MODEL is None:
+                # Imported lazily since importing torch alone takes seconds
+                from sentence_transformers import SentenceTransformer
+                
+                # Optional ONNX Runtime / OpenVINO backend instead of PyTorch eager
+                backend = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+                kwargs: Dict[str, Any] = {}
+                if backend != "torch":
+                    kwargs["backend"] = backend
+                    model_file = os.getenv("EMBEDDING_MODEL_FILE")
+                    if model_file:
+                        kwargs["model_kwargs"] = {"file_name": model_file}
+                
+                print(f"Loading embedding model ({backend})...")
+                try:
+                    model = SentenceTransformer(EMBEDDING_MODEL_NAME, **kwargs)
+                except Exception as e:
+                    # A requested model file is part of the embedding cache key,
+                    # so silently loading the float weights would poison the cache
+                    if not kwargs or "model_kwargs" in kwargs:
+                        raise
+                    print(f"{backend} backend unavailable ({e}), falling back to torch")
+                    backend = "torch"
+                    model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+                
+                max_seq_length = os.getenv("EMBEDDING_MAX_SEQ_LENGTH")
+                if max_seq_length:
+                    model.max_seq_length = int(max_seq_length)
+                if backend == "torch" and os.getenv("EMBEDDING_COMPILE", "").lower() in ("1", "true", "yes"):
+                    _compile_model(model)
+                
+                # Only publish the model once it is fully set up
+                _MODEL = model
+                print("Embedding model loaded successfully!")
+    return _MODEL
+
+def _compile_model(model: "SentenceTransformer") -> None:
+    """Compile the transformer with torch.compile and warm it up"""
+    transformer = model[0]
+    eager_model = transformer.auto_model
+    try:
+        import torch
+        
+        # Inputs are padded to the longest text in each batch, so shapes vary
+        # between calls; dynamic shapes avoid recompiling for every length
+        transformer.auto_model = torch.compile(eager_model, dynamic=True)
+        
+        # Trigger compilation now rather than on the first real request
+        model.encode(["warm up"], show_progress_bar=False)
+        print("Embedding model compiled with torch.compile")
+    except Exception as e:
+        transformer.auto_model = eager_model
+        print(f"torch.compile unavailable ({e}), using eager mode")
+
+def embedding_model_key() -> str:
+    """Identify the configured model weights, without loading them"""
+    # Quantized exports produce slightly different vectors than the float weights
+    key = EMBEDDING_MODEL_NAME
+    model_file = os.getenv("EMBEDDING_MODEL_FILE")
+    if model_file and os.getenv("EMBEDDING_BACKEND", "torch").lower() != "torch":
+        key += f":{model_file}"
+    # A shorter max sequence length truncates long texts to different vectors
+    max_seq_length = os.getenv("EMBEDDING_MAX_SEQ_LENGTH")
+    if max_seq_length:
+        key += f":seq{int(max_seq_length)}"
+    return key
+
+class EmbeddingCache:
+    """Persistent SQLite cache of embeddings keyed by SHA-256 of the content"""
+    
+    def __init__(self, db_path: str, model_name: str, dtype=EMBEDDING_CACHE_DTYPE):
+        self.dtype = np.dtype(dtype)
+        # Vectors stored at a different precision must never be mixed up
+        self.model_name = f"{model_name}/{self.dtype.name}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embedding_cache ("
+                "hash TEXT NOT NULL, model TEXT NOT NULL, vec BLOB NOT NULL, "
+                "PRIMARY KEY (hash, model))"
+            )
+    
+    @staticmethod
+    def content_hash(content: str) -> str:
+        """Return the cache key for a piece of text"""
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+    
+    def get_many(self, hashes: List[str]) -> Dict[str, np.ndarray]:
+        """Look up cached vectors, returning only the hashes that were found"""
+        found = {}
+        with self._lock:
+            for start in range(0, len(hashes), SQLITE_IN_BATCH_SIZE):
+                chunk = hashes[start:start + SQLITE_IN_BATCH_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT hash, vec FROM embedding_cache WHERE model = ? AND hash IN ({placeholders})",
+                    [self.model_name, *chunk]
+                ).fetchall()
+                for content_hash, vec in rows:
+                    found[content_hash] = np.frombuffer(vec, dtype=self.dtype)
+        return found
+    
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        """Store vectors for the given hashes"""
+        rows = [
+            (content_hash, self.model_name, np.asarray(vec, dtype=self.dtype).tobytes())
+            for content_hash, vec in items.items()
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (hash, model, vec) VALUES (?, ?, ?)",
+                rows
+            )
 
 class ChromaMemoryClient:
+    backend = "chromadb"
+    
     def __init__(self, collection_name: str = "memories", persist_directory: str = "./chroma_db"):
         """Initialize ChromaDB client with local persistence"""
         # Create persistent client
         self.client = chromadb.PersistentClient(path=persist_directory)
         
-        # Get or create collection
-        self.collection = self.client.get_or_create_collection(
-            name=collection_name,
-            metadata={"description": "MCP server memories"}
+        # Get or create collection; HNSW settings only apply at creation, so
+        # existing collections are opened as they are
+        self.collection_name = collection_name
+        try:
+            self.collection = self.client.get_collection(name=collection_name)
+        except chromadb.errors.NotFoundError:
+            self.collection = self.client.get_or_create_collection(
+                name=collection_name,
+                metadata=COLLECTION_METADATA
+            )
+        
+        # Small collections are searched exactly from memory (see _query)
+        self._index: Optional[Dict[str, InMemoryIndex]] = self._load_index()
+        self._index_lock = threading.Lock()
+        
+        self._init_caches(persist_directory)
+    
+    def _load_index(self) -> Optional[Dict[str, InMemoryIndex]]:
+        """Load every embedding into per-user matrices if the collection is small"""
+        if self.collection.count() >= BRUTE_FORCE_THRESHOLD:
+            return None
+        
+        results = self.collection.get(include=["embeddings", "documents", "metadatas"])
+        index: Dict[str, InMemoryIndex] = {}
+        if results['ids']:
+            self._add_to_index(
+                index,
+                results['ids'],
+                results['documents'],
+                np.asarray(results['embeddings'], dtype=np.float32),
+                results['metadatas']
+            )
+        return index
+    
+    def _index_size(self) -> int:
+        """Number of memories held in the in-memory mirror"""
+        return sum(user_index.size for user_index in self._index.values())
+    
+    @staticmethod
+    def _add_to_index(index: Dict[str, InMemoryIndex], ids: List[str], documents: List[str], embeddings: np.ndarray, metadatas: List[Dict[str, Any]]) -> None:
+        """Append records to the per-user matrices, one bulk add per user"""
+        rows_by_user: Dict[str, List[int]] = {}
+        for i, metadata in enumerate(metadatas):
+            rows_by_user.setdefault(metadata.get("user_id"), []).append(i)
+        
+        for user_id, rows in rows_by_user.items():
+            user_index = index.setdefault(user_id, InMemoryIndex(EMBEDDING_DIMENSION))
+            user_index.add(
+                [ids[i] for i in rows],
+                [documents[i] for i in rows],
+                embeddings[rows],
+                [metadatas[i] for i in rows]
+            )
+    
+    def _similarity(self, cosine: float) -> float:
+        """Convert a cosine similarity to the collection's 1 - distance score"""
+        # Chroma reports squared L2 for its default space: 2 - 2 * cos on unit vectors
+        if (self.collection.metadata or {}).get("hnsw:space", "l2") == "l2":
+            return 2 * cosine - 1
+        return cosine
+    
+    def _init_caches(self, persist_directory: str) -> None:
+        """Set up the caches shared by all backends"""
+        # Cache embeddings on disk so repeated texts skip the model entirely
+        self.embedding_cache = EmbeddingCache(
+            os.path.join(persist_directory, "embedding_cache.sqlite3"),
+            embedding_model_key()
         )
         
-        # Initialize embedding model (runs locally)
-        print("Loading embedding model...")
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        print("Embedding model loaded successfully!")
+        # In-process LRU in front of the disk cache for repeated queries
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        
+        # Memoized memory count, valid while no write has happened since.
+        # Writes from other processes are only noticed when _query reloads a
+        # stale in-memory mirror, so otherwise the count is per-process
+        self._version = 0
+        self._version_lock = threading.Lock()
+        self._count_cache: Optional[Tuple[int, int]] = None
     
-    def add_memory(self, content: str, user_id: str = "default_user") -> str:
-        """Add a new memory with semantic embedding"""
-        try:
-            memory_id = str(uuid.uuid4())
-            
-            # Create embedding
-            embedding = self.embedding_model.encode(content).tolist()
+    @cached_property
+    def embedding_model(self) -> "SentenceTransformer":
+        """Local embedding model, loaded lazily so startup doesn't wait on it"""
+        return get_embedding_model()
+    
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts, only running the model on those missing from the cache"""
+        hashes = [EmbeddingCache.content_hash(text) for text in texts]
+        cached = self.embedding_cache.get_many(list(set(hashes)))
+        
+        # Encode each uncached text once, even if it appears several times
+        misses = {h: text for h, text in zip(hashes, texts) if h not in cached}
+        if misses:
+            encoded = self.embedding_model.encode(
+                list(misses.values()),
+                batch_size=ENCODE_BATCH_SIZE,
+                show_progress_bar=False,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
+            # Round to the cache precision so hits and misses yield identical vectors
+            encoded = encoded.astype(self.embedding_cache.dtype)
+            new_vectors = dict(zip(misses.keys(), encoded))
+            self.embedding_cache.put_many(new_vectors)
+            cached.update(new_vectors)
+        
+        return np.stack([cached[h] for h in hashes]).astype(np.float32, copy=False)
+    
+    def _encode_query(self, text: str) -> np.ndarray:
+        """Embed a single text, memoizing the most recently used results"""
+        with self._query_cache_lock:
+            embedding = self._query_cache.get(text)
+            if embedding is not None:
+                self._query_cache.move_to_end(text)
+                return embedding
+        
+        embedding = self._embed([text])[0]
+        with self._query_cache_lock:
+            self._query_cache[text] = embedding
+            if len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        return embedding
+    
+    def _insert(self, ids: List[str], documents: List[str], embeddings: np.ndarray, metadatas: List[Dict[str, Any]]) -> None:
+        """Write records to ChromaDB, replacing any with the same id"""
+        # Insert in chunks to keep each ChromaDB transaction reasonably sized
+        for start in range(0, len(ids), CHROMA_BATCH_SIZE):
+            end = start + CHROMA_BATCH_SIZE
+            self.collection.upsert(
+                embeddings=embeddings[start:end],
+                documents=documents[start:end],
+                metadatas=metadatas[start:end],
+                ids=ids[start:end]
+            )
+        
+        with self._index_lock:
+            if self._index is not None:
+                self._add_to_index(self._index, ids, documents, embeddings, metadatas)
+                
+                # Past the threshold HNSW wins again, so stop mirroring the collection
+                if self._index_size() >= BRUTE_FORCE_THRESHOLD:
+                    self._index = None
+    
+    def _query(self, embedding: np.ndarray, user_id: str, limit: int) -> List[Dict[str, Any]]:
+        """Return the nearest memories of a user, best match first"""
+        with self._index_lock:
+            # Another process may have written to the collection since the
+            # mirror was loaded; reload it rather than serve stale results.
+            # Only a change in count is noticed: upserts from other processes
+            # that overwrite existing ids are not picked up until the next reload
+            if self._index is not None and self._index_size() != self.collection.count():
+                self._index = self._load_index()
+                self._bump_version()
             
-            # Prepare metadata
-            metadata = {
+            index = self._index
+            if index is not None:
+                user_index = index.get(user_id)
+                if user_index is None:
+                    return []
+                # Rows below the current size never move, so a view of them
+                # stays valid while later adds append or grow the matrix
+                embeddings = user_index.embeddings
+                ids, documents, metadatas = user_index.ids, user_index.documents, user_index.metadatas
+        
+        # Scan outside the lock so concurrent searches and adds don't queue
+        if index is not None:
+            rows, scores = top_k_cosine(embeddings, np.asarray(embedding, dtype=np.float32), limit)
+            return [
+                {
+                    "memory": documents[row],
+                    "id": ids[row],
+                    "metadata": metadatas[row],
+                    "similarity_score": self._similarity(score)
+                }
+                for row, score in zip(rows.tolist(), scores.tolist())
+            ]
+        
+        results = self.collection.query(
+            query_embeddings=embedding[np.newaxis, :],
+            n_results=limit,
+            where={"user_id": user_id}
+        )
+        
+        # Format results
+        memories = []
+        if results['documents'] and results['documents'][0]:
+            for i in range(len(results['documents'][0])):
+                memory = {
+                    "memory": results['documents'][0][i],
+                    "id": results['ids'][0][i],
+                    "metadata": results['metadatas'][0][i],
+                    "similarity_score": 1 - results['distances'][0][i] if results['distances'][0] else 1.0
+                }
+                memories.append(memory)
+        
+        return memories
+    
+    def _get(self, user_id: str, limit: Optional[int] = None, offset: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return a user's memories (optionally one page of them), in storage order"""
+        results = self.collection.get(
+            where={"user_id": user_id},
+            limit=limit,
+            offset=offset
+        )
+        
+        # Format results
+        memories = []
+        if results['documents']:
+            for i in range(len(results['documents'])):
+                memory = {
+                    "memory": results['documents'][i],
+                    "id": results['ids'][i],
+                    "metadata": results['metadatas'][i]
+                }
+                memories.append(memory)
+        
+        return memories
+    
+    def _existing_ids(self, ids: List[str]) -> set:
+        """Return which of the given ids are already stored"""
+        # Chunked, since ChromaDB binds every id as an SQL variable
+        existing = set()
+        for start in range(0, len(ids), SQLITE_IN_BATCH_SIZE):
+            chunk = ids[start:start + SQLITE_IN_BATCH_SIZE]
+            existing.update(self.collection.get(ids=chunk, include=[])['ids'])
+        return existing
+    
+    def _count(self) -> int:
+        """Return the number of stored memories across all users"""
+        return self.collection.count()
+    
+    def _bump_version(self) -> None:
+        """Invalidate the memoized count after the stored memories changed"""
+        with self._version_lock:
+            self._version += 1
+    
+    @staticmethod
+    def _memory_id(content: str, user_id: str) -> str:
+        """Deterministic id, so saving the same memory twice hits the same record"""
+        return hashlib.sha256(f"{user_id}\0{content}".encode('utf-8')).hexdigest()[:16]
+    
+    @staticmethod
+    def _timestamp_ns(metadata: Dict[str, Any]) -> int:
+        """Creation time in nanoseconds, derived from the ISO timestamp for older records"""
+        if "ts_ns" in metadata:
+            return metadata["ts_ns"]
+        if metadata.get("timestamp"):
+            return int(datetime.fromisoformat(metadata["timestamp"]).timestamp() * 1e9)
+        return 0
+    
+    @staticmethod
+    def _with_timestamps(memories: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add the ISO timestamp to each memory's metadata, which only stores ts_ns"""
+        for memory in memories:
+            metadata = memory['metadata']
+            if "ts_ns" in metadata and "timestamp" not in metadata:
+                timestamp = datetime.fromtimestamp(metadata["ts_ns"] / 1e9).isoformat()
+                memory['metadata'] = {**metadata, "timestamp": timestamp}
+        return memories
+    
+    def _add_many(self, texts: List[str], user_id: str, skip_existing: bool = False) -> int:
+        """Embed and store texts with batched encodes and inserts, returning how many were written"""
+        ids = [self._memory_id(text, user_id) for text in texts]
+        
+        # Ids are content hashes, so one lookup finds everything already stored
+        if skip_existing and ids:
+            existing = self._existing_ids(ids)
+            texts = [text for text, memory_id in zip(texts, ids) if memory_id not in existing]
+            ids = [memory_id for memory_id in ids if memory_id not in existing]
+        if not texts:
+            return 0
+        
+        metadatas = [
+            {
                 "user_id": user_id,
-                "timestamp": datetime.now().isoformat(),
-                "content_length": len(content)
+                "ts_ns": time.time_ns(),
+                "content_length": len(text)
             }
-            
-            # Add to ChromaDB
-            self.collection.add(
-                embeddings=[embedding],
-                documents=[content],
-                metadatas=[metadata],
-                ids=[memory_id]
-            )
+            for text in texts
+        ]
+        
+        # Single texts go through the LRU; batches encode all cache misses in one call
+        if len(texts) == 1:
+            embeddings = self._encode_query(texts[0])[np.newaxis, :]
+        else:
+            embeddings = self._embed(texts)
+        
+        self._insert(ids, texts, embeddings, metadatas)
+        self._bump_version()
+        return len(texts)
+    
+    def add_memory(self, content: str, user_id: str = "default_user") -> str:
+        """Add a new memory with semantic embedding"""
+        try:
+            self._add_many([content], user_id)
             
             return f"Successfully saved memory: {content[:100]}..." if len(content) > 100 else f"Successfully saved memory: {content}"
             
@@ -59,28 +498,10 @@ class ChromaMemoryClient:
         """Search memories using semantic similarity"""
         try:
             # Create query embedding
-            query_embedding = self.embedding_model.encode(query).tolist()
-            
-            # Search in ChromaDB with user filter
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=limit,
-                where={"user_id": user_id}
-            )
-            
-            # Format results
-            memories = []
-            if results['documents'] and results['documents'][0]:
-                for i in range(len(results['documents'][0])):
-                    memory = {
-                        "memory": results['documents'][0][i],
-                        "id": results['ids'][0][i],
-                        "metadata": results['metadatas'][0][i],
-                        "similarity_score": 1 - results['distances'][0][i] if results['distances'][0] else 1.0
-                    }
-                    memories.append(memory)
+            query_embedding = self._encode_query(query)
             
-            return memories
+            # Search the vector store with user filter
+            return self._with_timestamps(self._query(query_embedding, user_id, limit))
             
         except Exception as e:
             raise Exception(f"Failed to search memories: {str(e)}")
@@ -89,25 +510,17 @@ class ChromaMemoryClient:
         """Get all memories for a user"""
         try:
             # Get all memories for the user
-            results = self.collection.get(
-                where={"user_id": user_id}
-            )
+            memories = self._get(user_id)
             
-            # Format results
-            memories = []
-            if results['documents']:
-                for i in range(len(results['documents'])):
-                    memory = {
-                        "memory": results['documents'][i],
-                        "id": results['ids'][i],
-                        "metadata": results['metadatas'][i]
-                    }
-                    memories.append(memory)
-            
-            # Sort by timestamp (newest first)
-            memories.sort(key=lambda x: x['metadata'].get('timestamp', ''), reverse=True)
+            # Sort by timestamp (newest first) with one vectorized argsort
+            timestamps = np.fromiter(
+                (self._timestamp_ns(memory['metadata']) for memory in memories),
+                dtype=np.int64,
+                count=len(memories)
+            )
+            order = np.argsort(-timestamps, kind='stable')
             
-            return memories
+            return self._with_timestamps([memories[i] for i in order])
             
         except Exception as e:
             raise Exception(f"Failed to get memories: {str(e)}")
@@ -115,23 +528,32 @@ class ChromaMemoryClient:
     def export_memories_to_json(self, user_id: str = "default_user", filename: str = None) -> str:
         """Export all memories to JSON file for backup/transfer"""
         try:
-            memories = self.get_all_memories(user_id)
-            
             if filename is None:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 filename = f"memories_export_{timestamp}.json"
             
-            export_data = {
-                "export_timestamp": datetime.now().isoformat(),
-                "user_id": user_id,
-                "total_memories": len(memories),
-                "memories": memories
-            }
-            
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False)
+            # Stream page by page so only one page is ever held in memory;
+            # the total is only known at the end, so it is written last
+            total = 0
+            with open(filename, 'wb') as f:
+                f.write(b'{"export_timestamp": ' + orjson.dumps(datetime.now().isoformat()))
+                f.write(b', "user_id": ' + orjson.dumps(user_id))
+                f.write(b', "memories": [')
+                
+                offset = 0
+                while True:
+                    page = self._with_timestamps(self._get(user_id, limit=EXPORT_PAGE_SIZE, offset=offset))
+                    for memory in page:
+                        f.write(b'\n' if total == 0 else b',\n')
+                        f.write(orjson.dumps(memory))
+                        total += 1
+                    if len(page) < EXPORT_PAGE_SIZE:
+                        break
+                    offset += EXPORT_PAGE_SIZE
+                
+                f.write(b'\n], "total_memories": ' + orjson.dumps(total) + b'}\n')
             
-            return f"Exported {len(memories)} memories to {filename}"
+            return f"Exported {total} memories to {filename}"
             
         except Exception as e:
             raise Exception(f"Failed to export memories: {str(e)}")
@@ -139,18 +561,18 @@ class ChromaMemoryClient:
     def import_memories_from_json(self, filename: str, user_id: str = "default_user") -> str:
         """Import memories from JSON file"""
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                export_data = json.load(f)
+            with open(filename, 'rb') as f:
+                export_data = orjson.loads(f.read())
             
-            memories = export_data.get('memories', [])
-            imported_count = 0
+            # Collect everything in one pass so we can embed and insert in batches
+            texts = [m.get('memory', '') for m in export_data.get('memories', [])]
+            texts = list(dict.fromkeys(text for text in texts if text))
             
-            for memory_data in memories:
-                content = memory_data.get('memory', '')
-                if content:
-                    self.add_memory(content, user_id)
-                    imported_count += 1
+            imported_count = self._add_many(texts, user_id, skip_existing=True)
+            skipped_count = len(texts) - imported_count
             
+            if skipped_count:
+                return f"Imported {imported_count} memories from {filename} ({skipped_count} already present)"
             return f"Imported {imported_count} memories from {filename}"
             
         except Exception as e:
@@ -159,17 +581,49 @@ class ChromaMemoryClient:
     def get_collection_info(self) -> Dict[str, Any]:
         """Get information about the collection"""
         try:
-            count = self.collection.count()
+            # Read the version first, so a write racing with the count invalidates it
+            version = self._version
+            if self._count_cache is not None and self._count_cache[0] == version:
+                count = self._count_cache[1]
+            else:
+                count = self._count()
+                self._count_cache = (version, count)
+            
             return {
                 "total_memories": count,
-                "collection_name": self.collection.name,
-                "embedding_model": "all-MiniLM-L6-v2"
+                "collection_name": self.collection_name,
+                "backend": self.backend,
+                "embedding_model": EMBEDDING_MODEL_NAME
             }
         except Exception as e:
             return {"error": str(e)}
 
+# Client shared by every connection, so they all see the same in-memory state
+_CLIENT: Optional[ChromaMemoryClient] = None
+_CLIENT_LOCK = threading.Lock()
+
 def get_chromadb_client() -> ChromaMemoryClient:
+    """Return the shared ChromaDB client, creating it on first call"""
+    global _CLIENT
+    if _CLIENT is None:
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                _CLIENT = _create_chromadb_client()
+    return _CLIENT
+
+def _create_chromadb_client() -> ChromaMemoryClient:
     """Create and return ChromaDB client"""
+    # Opt-in lightweight backend for small collections, ChromaDB otherwise
+    if os.getenv("MEMORY_BACKEND", "chromadb").lower() == "sqlite-vec":
+        try:
+            from utils_sqlite_vec import SqliteVecMemoryClient
+            return SqliteVecMemoryClient(
+                collection_name="mcp_memories",
+                persist_directory="./chroma_db"
+            )
+        except (ImportError, AttributeError, sqlite3.OperationalError) as e:
+            print(f"sqlite-vec unavailable ({e}), falling back to ChromaDB")
+    
     try:
         # Create ChromaDB client with local storage
         client = ChromaMemoryClient(
@@ -0,0 +1,128 @@
+"""
+sqlite-vec utilities for MCP server
+Stores memories in a single SQLite file with a vec0 KNN index,
+a lighter alternative to ChromaDB for small collections
+"""
+import sqlite_vec
+import numpy as np
+import threading
+import sqlite3
+import json
+import os
+from typing import List, Dict, Any, Optional
+
+from utils_chromadb import ChromaMemoryClient, EMBEDDING_DIMENSION, SQLITE_IN_BATCH_SIZE
+
+class SqliteVecMemoryClient(ChromaMemoryClient):
+    backend = "sqlite-vec"
+    
+    def __init__(self, collection_name: str = "memories", persist_directory: str = "./chroma_db"):
+        """Initialize sqlite-vec storage next to the embedding cache"""
+        os.makedirs(persist_directory, exist_ok=True)
+        self.collection_name = collection_name
+        
+        # Load the vec0 extension (raises if this Python's sqlite3 can't load extensions)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(persist_directory, f"{collection_name}.sqlite3"),
+            check_same_thread=False
+        )
+        self._conn.enable_load_extension(True)
+        sqlite_vec.load(self._conn)
+        self._conn.enable_load_extension(False)
+        
+        # Plain table for documents and metadata, vec0 table for the vectors
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS memories ("
+                "rowid INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE, "
+                "content TEXT NOT NULL, user_id TEXT NOT NULL, metadata TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS memories_user_id ON memories (user_id)"
+            )
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS memories_vec USING vec0("
+                "user_id TEXT PARTITION KEY, "
+                f"embedding FLOAT[{EMBEDDING_DIMENSION}] distance_metric=cosine)"
+            )
+        
+        self._init_caches(persist_directory)
+    
+    def _insert(self, ids: List[str], documents: List[str], embeddings: np.ndarray, metadatas: List[Dict[str, Any]]) -> None:
+        """Write records to both tables in a single transaction, replacing any with the same id"""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        with self._lock, self._conn:
+            for memory_id, document, embedding, metadata in zip(ids, documents, embeddings, metadatas):
+                # Upsert keeps the rowid of an existing id, so the vector row can follow it
+                (rowid,) = self._conn.execute(
+                    "INSERT INTO memories (id, content, user_id, metadata) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (id) DO UPDATE SET content = excluded.content, "
+                    "user_id = excluded.user_id, metadata = excluded.metadata "
+                    "RETURNING rowid",
+                    (memory_id, document, metadata["user_id"], json.dumps(metadata))
+                ).fetchone()
+                self._conn.execute("DELETE FROM memories_vec WHERE rowid = ?", (rowid,))
+                self._conn.execute(
+                    "INSERT INTO memories_vec (rowid, user_id, embedding) VALUES (?, ?, ?)",
+                    (rowid, metadata["user_id"], embedding.tobytes())
+                )
+    
+    def _query(self, embedding: np.ndarray, user_id: str, limit: int) -> List[Dict[str, Any]]:
+        """Return the nearest memories of a user, best match first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "WITH knn AS ("
+                "  SELECT rowid, distance FROM memories_vec"
+                "  WHERE embedding MATCH ? AND k = ? AND user_id = ?"
+                ") "
+                "SELECT m.id, m.content, m.metadata, knn.distance "
+                "FROM knn JOIN memories m ON m.rowid = knn.rowid "
+                "ORDER BY knn.distance",
+                (np.asarray(embedding, dtype=np.float32).tobytes(), limit, user_id)
+            ).fetchall()
+        
+        return [
+            {
+                "memory": content,
+                "id": memory_id,
+                "metadata": json.loads(metadata),
+                "similarity_score": 1 - distance
+            }
+            for memory_id, content, metadata, distance in rows
+        ]
+    
+    def _get(self, user_id: str, limit: Optional[int] = None, offset: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return a user's memories (optionally one page of them), in storage order"""
+        sql = "SELECT id, content, metadata FROM memories WHERE user_id = ? ORDER BY rowid"
+        params: List[Any] = [user_id]
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset or 0]
+        
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        
+        return [
+            {"memory": content, "id": memory_id, "metadata": json.loads(metadata)}
+            for memory_id, content, metadata in rows
+        ]
+    
+    def _existing_ids(self, ids: List[str]) -> set:
+        """Return which of the given ids are already stored"""
+        existing = set()
+        with self._lock:
+            for start in range(0, len(ids), SQLITE_IN_BATCH_SIZE):
+                chunk = ids[start:start + SQLITE_IN_BATCH_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT id FROM memories WHERE id IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                existing.update(memory_id for (memory_id,) in rows)
+        return existing
+    
+    def _count(self) -> int:
+        """Return the number of stored memories across all users"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0]
@@ -0,0 +1,103 @@
+"""
+In-memory vector scan utilities for MCP server
+Exact top-k search over a dense embedding matrix, used instead of
+ChromaDB's HNSW index while collections are small
+"""
+import numpy as np
+from typing import List, Dict, Any, Tuple
+
+# SimSIMD and Numba are optional: SimSIMD's runtime-dispatched SIMD kernels
+# are preferred, then a Numba JIT loop, then a plain NumPy matmul
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+if simsimd is not None:
+    def _dot_scores(embeddings: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Cosine similarity of every row with the query"""
+        distances = simsimd.cdist(query[np.newaxis, :], embeddings, metric="cosine")
+        return 1 - np.asarray(distances, dtype=np.float32)[0]
+elif numba is not None:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _dot_scores(embeddings: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Dot product of every row with the query"""
+        scores = np.empty(embeddings.shape[0], dtype=np.float32)
+        for i in numba.prange(embeddings.shape[0]):
+            acc = np.float32(0.0)
+            for j in range(embeddings.shape[1]):
+                acc += embeddings[i, j] * query[j]
+            scores[i] = acc
+        return scores
+else:
+    def _dot_scores(embeddings: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Dot product of every row with the query"""
+        return embeddings @ query
+
+def top_k_cosine(embeddings: np.ndarray, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (row indices, cosine similarities) of the k best rows, best first
+    
+    Both the rows and the query are expected to be L2-normalized.
+    """
+    k = min(k, len(embeddings))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    
+    scores = _dot_scores(embeddings, query)
+    
+    # Partial selection of the top k, then sort only those
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return top, scores[top]
+
+class InMemoryIndex:
+    """Dense float32 matrix of one user's memories for brute-force search"""
+    
+    def __init__(self, dimension: int):
+        self._embeddings = np.empty((0, dimension), dtype=np.float32)
+        self.size = 0
+        self.ids: List[str] = []
+        self.documents: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}
+    
+    @property
+    def embeddings(self) -> np.ndarray:
+        return self._embeddings[:self.size]
+    
+    def add(self, ids: List[str], documents: List[str], embeddings: np.ndarray, metadatas: List[Dict[str, Any]]) -> None:
+        """Insert or replace records, growing the matrix geometrically to keep adds cheap"""
+        # Like ChromaDB's upsert, ids that are already present are overwritten in place
+        new = []
+        for i, memory_id in enumerate(ids):
+            row = self._rows.get(memory_id)
+            if row is None:
+                new.append(i)
+                continue
+            self._embeddings[row] = embeddings[i]
+            self.documents[row] = documents[i]
+            self.metadatas[row] = metadatas[i]
+        
+        if len(new) < len(ids):
+            ids = [ids[i] for i in new]
+            documents = [documents[i] for i in new]
+            embeddings = embeddings[new]
+            metadatas = [metadatas[i] for i in new]
+        
+        needed = self.size + len(ids)
+        if needed > len(self._embeddings):
+            grown = np.empty((max(needed, 2 * len(self._embeddings)), self._embeddings.shape[1]), dtype=np.float32)
+            grown[:self.size] = self.embeddings
+            self._embeddings = grown
+        
+        self._embeddings[self.size:needed] = embeddings
+        self._rows.update((memory_id, self.size + i) for i, memory_id in enumerate(ids))
+        self.size = needed
+        self.ids.extend(ids)
+        self.documents.extend(documents)
+        self.metadatas.extend(metadatas)